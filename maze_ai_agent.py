@@ -1,20 +1,10 @@
 from collections import deque
 import pygame
 import time
-from enum import Enum
 import heapq
 import json
 import matplotlib.pyplot as plt
-
-class Color(Enum):
-    WHITE = (255, 255, 255)
-    BLACK = (0, 0, 0)
-    BLUE = (0, 0, 255)
-    RED = (255, 0, 0)
-    GREEN = (0, 255, 0)
-    YELLOW = (255, 255, 0)
-    ORANGE = (255, 165, 0)
-    GREY = (200, 200, 200)
+from search_replay import Color, SearchLog
 
 
 class Node:
@@ -32,12 +22,17 @@ class Node:
 
 
 class MazeAiAgent:
-    def __init__(self, maze, initial_state, goal_state, algorithm):
+    def __init__(self, maze, initial_state, goal_state, algorithm, visualize = True, record = False):
         self.maze = maze
         self.initial_state = initial_state
         self.goal_state = goal_state
         self.screen = None          
-        self.initialize_visualization() 
+        # when record is True, the expansion order and the shortest path are kept so the search can be replayed afterwards
+        self.record = record
+        self.search_log = SearchLog()
+        # skip the real-time drawing when visualize is False, the search then runs at full speed
+        if (visualize):
+            self.initialize_visualization() 
         self.total_states_visited = 0
         if (algorithm == "bfs"):
             self.bfs()
@@ -190,6 +185,10 @@ class MazeAiAgent:
 
     def represent_current_state(self, current_state):
         """ Draws a BLUE rect on the current state (x, y locations) """
+        if (self.record):
+            self.search_log.record_expansion(current_state)
+        if (self.screen is None):
+            return
         pygame.draw.rect(self.screen, Color.BLUE.value, (current_state[1] * 30, current_state[0] * 30, 30, 30))
         pygame.draw.rect(self.screen, Color.GREY.value, (current_state[1] * 30, current_state[0] * 30, 30, 30), 1)
         pygame.display.update()
@@ -243,6 +242,8 @@ class MazeAiAgent:
     def mark_as_visited(self, current_state):
         """ Updates the current state as Visited and sets the Color of the Current State to Orange Instead of Blue """
         self.maze[current_state[0]][current_state[1]] = "V"
+        if (self.screen is None):
+            return
         pygame.draw.rect(self.screen, Color.YELLOW.value, (current_state[1] * 30, current_state[0] * 30, 30, 30))
         pygame.draw.rect(self.screen, Color.GREY.value, (current_state[1] * 30, current_state[0] * 30, 30, 30), 1)
         pygame.display.update()
@@ -252,6 +253,10 @@ class MazeAiAgent:
     
     def draw_shortest_path(self, shortest_path):
         """ Draws the Shortest Path to reach the Goal State from the Initial State """
+        if (self.record):
+            self.search_log.record_path(shortest_path)
+        if (self.screen is None):
+            return
         for route in shortest_path:
             pygame.draw.rect(self.screen, Color.GREEN.value, (route[1] * 30, route[0] * 30, 30, 30))
             pygame.draw.rect(self.screen, Color.GREY.value, (route[1] * 30, route[0] * 30, 30, 30), 1)
@@ -323,6 +328,12 @@ maze_a_star_has_advantage = [
 
 # Please uncomment either one of the following search algorithms and run
 
+# Run the search without drawing and replay it afterwards at any speed
+# from search_replay import MazeReplay
+# agent = MazeAiAgent(maze = maze_a_star_has_advantage, initial_state = (8, 1), goal_state = (1, 2), algorithm = "bfs", visualize = False, record = True)
+# MazeReplay(agent.maze, agent.initial_state, agent.goal_state, agent.search_log).play(delay = 0.02)
+# MazeReplay(agent.maze, agent.initial_state, agent.goal_state, agent.search_log).save_gif("maze_bfs.gif")
+
 #  BFS
 bfs_num_of_visited_nodes = MazeAiAgent(maze = maze_a_star_has_advantage, initial_state = (8, 1), goal_state = (1, 2), algorithm = "a_star").total_states_visited
 
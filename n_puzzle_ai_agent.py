@@ -5,6 +5,8 @@ from tabulate import tabulate
 import json
 import copy
 import heapq
+import numpy as np
+from search_replay import SearchLog
 
 
 class Node:
@@ -23,14 +25,22 @@ class Node:
 """ An N Puzzle AI Agent that uses either BFS or A* to search and find the goal state """
 """ A* works on any ratios of 2D grids, but it assumes that there is no duplicate numbers """
 """ BFS works on any ratios of 2D grids """
+""" Vectorized BFS works on any ratios of 2D grids as long as a state fits into 64 bits (e.g. 3x3, 2x5, 3x4, 4x4) """
 class NPuzzleAiAgent:
-    def __init__(self, initial_state, goal_state, initial_blank_tile_loc, algorithm):
+    def __init__(self, initial_state, goal_state, initial_blank_tile_loc, algorithm, visualize = True, record = False):
         self.initial_state = initial_state
         self.goal_state = goal_state
         self.initial_blank_tile_loc = initial_blank_tile_loc
+        # printing every expanded state dominates the run time, set visualize to False and replay the search log instead
+        self.visualize = visualize
+        # when record is True, the expansion order and the shortest path are kept as tile codes so the search can be replayed afterwards
+        self.record = record
+        self.search_log = SearchLog(self.get_tile_codes(), len(initial_state[0]))
         # run the chosen algorithm 
         if algorithm == "bfs":
             self.bfs()
+        elif algorithm == "bfs_vectorized":
+            self.bfs_vectorized()
         elif algorithm == "a_star":
             # prepare a dictionary to optimize the Manhattan heuristic function calculation
             self.goal_state_tile_locations = self.get_goal_state_tile_locations()
@@ -51,8 +61,11 @@ class NPuzzleAiAgent:
         while queue:
             current_state, blank_tile_location = queue.popleft()
 
-            # visualize the current state
-            self.represent_current_state(current_state)
+            # record and visualize the current state
+            if (self.record):
+                self.search_log.record_expansion(current_state)
+            if (self.visualize):
+                self.represent_current_state(current_state)
 
             # check if the current state is the same as the goal state
             goal_reached = self.test_goal(current_state)
@@ -60,6 +73,8 @@ class NPuzzleAiAgent:
             if (goal_reached):
                 print("Goal reached!")
                 shortest_path = self.reconstruct_path_bfs(current_state, state_parents)
+                if (self.record):
+                    self.search_log.record_path(shortest_path)
                 print(shortest_path)
                 print(len(visited_list))
                 return 
@@ -70,7 +85,140 @@ class NPuzzleAiAgent:
                 queue.append(state)
 
             visited_list[json.dumps(current_state)] = True
-            
+
+
+    def bfs_vectorized(self):
+        """ Does Level-by-Level BFS Where Each Frontier is a NumPy Array of Packed States
+            Like bfs, it reports the number of states expanded before the goal state, the goal's level is expanded in sorted key order """
+        height = len(self.initial_state)
+        width = len(self.initial_state[0])
+        num_of_cells = height * width
+
+        # give every distinct tile a small integer code, the blank tile is always 0
+        tile_codes = self.get_tile_codes()
+        self.code_tiles = {code: tile for tile, code in tile_codes.items()}
+
+        # the goal state can't be reached if it has a tile that the initial state doesn't have
+        if any(tile not in tile_codes for row in self.goal_state for tile in row):
+            print("No path found")
+            self.total_states_visited = 0
+            return None
+
+        # every state is packed into a single 64-bit key with a fixed number of bits per cell
+        bits_per_cell = max(1, (len(tile_codes) - 1).bit_length())
+        if (bits_per_cell * num_of_cells > 64):
+            raise ValueError("The puzzle is too large to pack each state into 64 bits")
+        self.tile_shifts = np.arange(num_of_cells, dtype=np.uint64) * np.uint64(bits_per_cell)
+        self.tile_mask = np.uint64((1 << bits_per_cell) - 1)
+
+        initial_states = np.array([[tile_codes[tile] for row in self.initial_state for tile in row]], dtype=np.uint8)
+        goal_states = np.array([[tile_codes[tile] for row in self.goal_state for tile in row]], dtype=np.uint8)
+        goal_key = self.pack_states(goal_states)[0]
+
+        # precompute the LEFT, TOP, RIGHT and BOTTOM neighbour of every cell (-1 if it is outside the grid)
+        neighbours = np.full((num_of_cells, 4), -1, dtype=np.int64)
+        for cell in range(num_of_cells):
+            y, x = divmod(cell, width)
+            if (x > 0):
+                neighbours[cell, 0] = cell - 1
+            if (y > 0):
+                neighbours[cell, 1] = cell - width
+            if (x < width - 1):
+                neighbours[cell, 2] = cell + 1
+            if (y < height - 1):
+                neighbours[cell, 3] = cell + width
+
+        # initialize the frontier with the initial state
+        frontier_states = initial_states
+        frontier_blanks = np.array([self.initial_blank_tile_loc[0] * width + self.initial_blank_tile_loc[1]], dtype=np.int64)
+        frontier_keys = self.pack_states(frontier_states)
+        previous_keys = np.empty(0, dtype=np.uint64)
+
+        # storage for every level's sorted keys and the index of each state's parent in the previous level
+        levels = [(frontier_keys, np.array([-1], dtype=np.int64))]
+        total_states_visited = 0
+
+        while frontier_keys.size:
+            # check if the goal state is in the current level
+            goal_index = np.searchsorted(frontier_keys, goal_key)
+            goal_reached = goal_index < frontier_keys.size and frontier_keys[goal_index] == goal_key
+
+            # record the level as expanded, up to and including the goal state if it is in this level
+            if (self.record):
+                expanded_keys = frontier_keys[:goal_index + 1] if goal_reached else frontier_keys
+                self.search_log.record_expansions(self.unpack_codes(expanded_keys))
+
+            if (goal_reached):
+                print("Goal reached!")
+                # the states of the goal's level with smaller keys are expanded before the goal state
+                total_states_visited += int(goal_index)
+                shortest_path = self.reconstruct_path_bfs_vectorized(levels, goal_index, width)
+                if (self.record):
+                    self.search_log.record_path(shortest_path)
+                print(shortest_path)
+                print(total_states_visited)
+                self.total_states_visited = total_states_visited
+                return shortest_path
+
+            # generate the successors of the whole level at once, one direction at a time
+            child_states = []
+            child_blanks = []
+            child_parents = []
+            for direction in range(4):
+                targets = neighbours[frontier_blanks, direction]
+                movable = np.nonzero(targets >= 0)[0]
+                rows = np.arange(movable.size)
+                # fancy indexing gives us a copy, so the frontier itself is not modified
+                moved_states = frontier_states[movable]
+                moved_blanks = frontier_blanks[movable]
+                moved_targets = targets[movable]
+                # switch the neighbouring tile with the blank tile
+                moved_states[rows, moved_blanks] = moved_states[rows, moved_targets]
+                moved_states[rows, moved_targets] = 0
+                child_states.append(moved_states)
+                child_blanks.append(moved_targets)
+                child_parents.append(movable)
+
+            child_states = np.concatenate(child_states)
+            child_blanks = np.concatenate(child_blanks)
+            child_parents = np.concatenate(child_parents)
+
+            # remove the duplicates within the next level, np.unique also sorts the keys
+            child_keys, unique_indices = np.unique(self.pack_states(child_states), return_index=True)
+
+            # every move flips the colour of the blank tile's cell on a checkerboard, so a successor can't be
+            # in the current level and the only visited states it can repeat are the ones in the previous level
+            unvisited = ~np.isin(child_keys, previous_keys, assume_unique=True)
+            child_keys = child_keys[unvisited]
+            unique_indices = unique_indices[unvisited]
+
+            # move on to the next level
+            total_states_visited += frontier_keys.size
+            previous_keys = frontier_keys
+            frontier_keys = child_keys
+            frontier_states = child_states[unique_indices]
+            frontier_blanks = child_blanks[unique_indices]
+            levels.append((frontier_keys, child_parents[unique_indices]))
+
+        print("No path found")
+        print(total_states_visited)
+        self.total_states_visited = total_states_visited
+        return None
+
+    def pack_states(self, states):
+        """ Packs Each Row of Tile Codes into a Single 64-Bit Key """
+        return np.bitwise_or.reduce(states.astype(np.uint64) << self.tile_shifts, axis=1)
+
+    def unpack_codes(self, keys):
+        """ Turns an Array of Packed 64-Bit Keys Back into Rows of Tile Codes """
+        return ((keys[:, np.newaxis] >> self.tile_shifts) & self.tile_mask).astype(np.uint8)
+
+    def unpack_state(self, key, width):
+        """ Turns a Packed 64-Bit Key Back into a Grid of Tiles """
+        codes = (np.uint64(key) >> self.tile_shifts) & self.tile_mask
+        tiles = [self.code_tiles[int(code)] for code in codes]
+        return [tiles[y:y + width] for y in range(0, len(tiles), width)]
+
 
     def a_star(self):
         """ Does A* to reach the goal state """
@@ -87,17 +235,21 @@ class NPuzzleAiAgent:
         while min_f_heap:
             current_state_node = heapq.heappop(min_f_heap)
 
-            # visualize the current state visit
-            self.represent_current_state(current_state_node.state)
+            # record and visualize the current state visit
+            if (self.record):
+                self.search_log.record_expansion(current_state_node.state)
+            if (self.visualize):
+                self.represent_current_state(current_state_node.state)
 
             # check if we reached the goal state
             reached_goal_state = self.test_goal(current_state_node.state)
             
             if (reached_goal_state):
                 print("Reached Goal State!")
+                if (self.record):
+                    self.search_log.record_path(self.reconstruct_path(current_state_node))
                 print(len(visited))
                 return
-                # return self.reconstruct_path(current_state_node)
             
             # mark the current state as visited
             current_state = json.dumps(current_state_node.state)
@@ -111,6 +263,15 @@ class NPuzzleAiAgent:
         # return none if a path does not exist 
         return None
 
+    def get_tile_codes(self):
+        """ Gives Every Distinct Tile of the Initial State a Small Integer Code, the Blank Tile is Always 0 """
+        tile_codes = {" ": 0}
+        for row in self.initial_state:
+            for tile in row:
+                if (tile not in tile_codes):
+                    tile_codes[tile] = len(tile_codes)
+        return tile_codes
+
     def get_goal_state_tile_locations(self):
         """ Function that helps determine where a tile is supposed to be located in the Goal State in O(1) time """
         goal_state_tile_locations = {}
@@ -285,6 +446,14 @@ class NPuzzleAiAgent:
             current_state = json.loads(state_parents[json.dumps(current_state)])
         return shortest_path        
 
+    def reconstruct_path_bfs_vectorized(self, levels, index, width):
+        """ Returns the Shortest Path from the Initial State to the Goal State by Following the Parent Indices Level by Level """
+        shortest_path = []
+        for keys, parents in reversed(levels):
+            shortest_path.append(self.unpack_state(keys[index], width))
+            index = parents[index]
+        return shortest_path
+
 
 # Testing the 8 Puzzle AI Agent with the A* algorithm
 
@@ -337,6 +506,11 @@ goal_state = [
 # NPuzzleAiAgent(initial_state_4, goal_state, (1, 1), "a_star")
 # NPuzzleAiAgent(initial_state_5, goal_state, (1, 1), "a_star")
 NPuzzleAiAgent(initial_state_6, goal_state, (1, 1), "bfs")
+# Run the search without printing every state and replay it afterwards
+# from search_replay import NPuzzleReplay
+# agent = NPuzzleAiAgent(initial_state_6, goal_state, (1, 1), "bfs", visualize = False, record = True)
+# NPuzzleReplay(agent.search_log).play(show_expansions = False)
+# NPuzzleAiAgent(initial_state_6, goal_state, (1, 1), "bfs_vectorized")
 # NPuzzleAiAgent(initial_state_6, goal_state, (1, 1), "a_star")
 
 
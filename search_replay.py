@@ -0,0 +1,190 @@
+import time
+from enum import Enum
+import numpy as np
+import pygame
+from PIL import Image
+from tabulate import tabulate
+
+
+class Color(Enum):
+    WHITE = (255, 255, 255)
+    BLACK = (0, 0, 0)
+    BLUE = (0, 0, 255)
+    RED = (255, 0, 0)
+    GREEN = (0, 255, 0)
+    YELLOW = (255, 255, 0)
+    ORANGE = (255, 165, 0)
+    GREY = (200, 200, 200)
+
+
+""" Maze states are stored as (y, x) rows and N puzzle grids as rows of tile codes (the blank tile is always 0) """
+class SearchLog:
+    def __init__(self, tile_codes = None, width = None):
+        self.tile_codes = tile_codes
+        self.code_tiles = None if tile_codes is None else {code: tile for tile, code in tile_codes.items()}
+        self.width = width
+        self.dtype = np.int64 if tile_codes is None else np.uint8
+        # the expansion order is kept in a buffer that doubles in size whenever it is full
+        self.expansions = None
+        self.num_of_expansions = 0
+        self.path = None
+
+    def encode_state(self, state):
+        """ Turns a (y, x) Maze State or an N Puzzle Grid into a Row of Integers """
+        if (self.tile_codes is None):
+            return state
+        return [self.tile_codes[tile] for row in state for tile in row]
+
+    def decode_state(self, row):
+        """ Turns a Row of Integers Back into a (y, x) Maze State or an N Puzzle Grid """
+        if (self.code_tiles is None):
+            return (int(row[0]), int(row[1]))
+        tiles = [self.code_tiles[int(code)] for code in row]
+        return [tiles[y:y + self.width] for y in range(0, len(tiles), self.width)]
+
+    def reserve_expansions(self, num_of_rows, row_length):
+        """ Makes Sure the Expansion Buffer Has Room for num_of_rows More Rows """
+        if (self.expansions is None):
+            self.expansions = np.empty((max(1024, num_of_rows), row_length), dtype = self.dtype)
+        needed = self.num_of_expansions + num_of_rows
+        if (needed > len(self.expansions)):
+            grown_expansions = np.empty((max(needed, 2 * len(self.expansions)), row_length), dtype = self.dtype)
+            grown_expansions[:self.num_of_expansions] = self.expansions[:self.num_of_expansions]
+            self.expansions = grown_expansions
+
+    def record_expansion(self, state):
+        """ Adds a State to the Expansion Order """
+        row = self.encode_state(state)
+        self.reserve_expansions(1, len(row))
+        self.expansions[self.num_of_expansions] = row
+        self.num_of_expansions += 1
+
+    def record_expansions(self, rows):
+        """ Adds Already Encoded Rows (e.g. a whole BFS level) to the Expansion Order """
+        self.reserve_expansions(len(rows), rows.shape[1])
+        self.expansions[self.num_of_expansions:self.num_of_expansions + len(rows)] = rows
+        self.num_of_expansions += len(rows)
+
+    def record_path(self, shortest_path):
+        """ Stores the Shortest Path, the reconstruct functions return it from the goal state backwards """
+        self.path = np.array([self.encode_state(state) for state in reversed(shortest_path)], dtype = self.dtype)
+
+    def expansion_array(self):
+        """ Returns the Expansion Order as an Integer Array (one row per expanded state) """
+        if (self.expansions is None):
+            return np.empty((0, 0), dtype = self.dtype)
+        return self.expansions[:self.num_of_expansions]
+
+    def path_array(self):
+        """ Returns the Shortest Path from the Initial State to the Goal State as an Integer Array """
+        if (self.path is None):
+            return np.empty((0, 0), dtype = self.dtype)
+        return self.path
+
+
+""" Replays a Maze search log to a pygame window, a PNG image sequence or a GIF """
+class MazeReplay:
+    def __init__(self, maze, initial_state, goal_state, search_log, cell_size = 30):
+        self.maze = maze
+        self.initial_state = initial_state
+        self.goal_state = goal_state
+        self.search_log = search_log
+        self.cell_size = cell_size
+
+    def play(self, delay = 0.10, path_delay = 0.50, steps_per_frame = 1):
+        """ Replays the Search in a pygame Window at the Given Speed """
+        pygame.init()
+        screen = pygame.display.set_mode((len(self.maze[0]) * self.cell_size, len(self.maze) * self.cell_size))
+        pygame.display.set_caption("Replay of the AI Agent Solving the Maze Problem")
+
+        for surface, is_path_frame in self.frames(steps_per_frame):
+            screen.blit(surface, (0, 0))
+            pygame.display.update()
+            # pause for a bit to make it easier to follow up with the ai agent
+            time.sleep(path_delay if is_path_frame else delay)
+
+    def save_frames(self, file_prefix, steps_per_frame = 1):
+        """ Saves Every Frame of the Replay as a Numbered PNG Image and Returns the File Names """
+        file_names = []
+        for frame_number, (surface, _) in enumerate(self.frames(steps_per_frame)):
+            file_name = f"{file_prefix}_{frame_number:05d}.png"
+            pygame.image.save(surface, file_name)
+            file_names.append(file_name)
+        return file_names
+
+    def save_gif(self, file_name, delay = 0.10, path_delay = 0.50, steps_per_frame = 1):
+        """ Saves the Replay as an Animated GIF """
+        images = []
+        durations = []
+        for surface, is_path_frame in self.frames(steps_per_frame):
+            images.append(Image.frombytes("RGB", surface.get_size(), pygame.image.tobytes(surface, "RGB")))
+            # PIL expects the duration of each frame in milliseconds
+            durations.append(int((path_delay if is_path_frame else delay) * 1000))
+        images[0].save(file_name, save_all = True, append_images = images[1:], duration = durations, loop = 0)
+
+    def frames(self, steps_per_frame = 1):
+        """ Yields an Off-Screen Surface After Every steps_per_frame Events, and Whether it Belongs to the Shortest Path """
+        surface = pygame.Surface((len(self.maze[0]) * self.cell_size, len(self.maze) * self.cell_size))
+        self.draw_initial_maze(surface)
+        yield surface, False
+
+        # replay the expansion order, the latest expanded state is BLUE and the earlier ones are YELLOW
+        previous_state = None
+        expansions = self.search_log.expansion_array()
+        for step, state in enumerate(expansions, start = 1):
+            if (previous_state is not None):
+                self.draw_cell(surface, previous_state, Color.YELLOW.value)
+            self.draw_cell(surface, state, Color.BLUE.value)
+            previous_state = state
+            if (step % steps_per_frame == 0 or step == len(expansions)):
+                yield surface, False
+
+        if (previous_state is not None):
+            self.draw_cell(surface, previous_state, Color.YELLOW.value)
+
+        # replay the shortest path one state at a time
+        for state in self.search_log.path_array():
+            self.draw_cell(surface, state, Color.GREEN.value)
+            yield surface, True
+
+    def draw_initial_maze(self, surface):
+        """ Draws the Maze with the Initial State and the Goal State """
+        for y in range(len(self.maze)):
+            for x in range(len(self.maze[0])):
+                # default color of a block, the search marks visited blocks with "V" so anything but a wall is open
+                current_cell_color = Color.BLACK.value
+                if (y == self.goal_state[0] and x == self.goal_state[1]):
+                    current_cell_color = Color.GREEN.value
+                elif (y == self.initial_state[0] and x == self.initial_state[1]):
+                    current_cell_color = Color.RED.value
+                elif (self.maze[y][x] != "#"):
+                    current_cell_color = Color.WHITE.value
+
+                self.draw_cell(surface, (y, x), current_cell_color)
+
+    def draw_cell(self, surface, state, color):
+        """ Draws a Block with a Grey Border on the (y, x) Location of the State """
+        rect = (int(state[1]) * self.cell_size, int(state[0]) * self.cell_size, self.cell_size, self.cell_size)
+        pygame.draw.rect(surface, color, rect)
+        pygame.draw.rect(surface, Color.GREY.value, rect, 1)
+
+
+""" Replays an N Puzzle search log as text """
+class NPuzzleReplay:
+    def __init__(self, search_log):
+        self.search_log = search_log
+
+    def play(self, delay = 0.0, show_expansions = True):
+        """ Prints the Expanded States and Then the Shortest Path at the Given Speed """
+        if (show_expansions):
+            for row in self.search_log.expansion_array():
+                self.represent_state(self.search_log.decode_state(row))
+                time.sleep(delay)
+
+        print("Shortest path:")
+        for row in self.search_log.path_array():
+            self.represent_state(self.search_log.decode_state(row))
+            time.sleep(delay)
+
+    def represent_state(self, state):
+        print(tabulate(state, tablefmt="grid"))